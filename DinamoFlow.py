@@ -1,20 +1,110 @@
-from abc import ABC,abstractmethod
-from typing import Dict,List,Tuple,Iterable,Optional
+from typing import Dict,List,Tuple,Iterable,Iterator,Optional,Sequence
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import math
+import os
 import re
+import sys
+
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+try:
+    # Extension opcional en Cython (_amount.pyx), se compila con: cythonize -i _amount.pyx
+    from _amount import normalize_amounts as _normalize_amounts_c
+except ImportError:
+    _normalize_amounts_c = None
+
+# Caracteres que no forman parte de un monto (se conservan digitos, separadores y signo)
+_STRIP_RE = re.compile(r"[^\d.,-]")
+
+def _compile_regex(regex:str, use_re2:bool=False):
+    """
+    Compila una expresión regular de validación
+    Con use_re2 usa google-re2 (ver ContextualFieldValidation). Si re2 no soporta el patrón (referencias
+    hacia atrás, lookaround) se lanza ValueError en lugar de usar `re`, que no garantiza tiempo lineal
+    """
+    if use_re2:
+        if re2 is None:
+            raise ImportError("use_re2 requiere el paquete google-re2")
+        try:
+            return re2.compile(regex)
+        except re2.error as exc:
+            raise ValueError(f"re2 no soporta la expresión regular '{regex}': {exc}") from exc
+    return re.compile(regex)
+
+# Resultado compartido de las operaciones sin errores, evita crear una lista vacia por llamada
+_NO_ERRORS: Tuple[str, ...] = ()
+
+# Claves de metadatos del registro, internadas para que las busquedas en el diccionario comparen por identidad
+_K_TYPE = sys.intern("__type__")
+_K_ESTADO = sys.intern("__estado__")
+_K_ERRORS = sys.intern("__errors__")
+
+def _intern_field_name(field_name):
+    """
+    Interna el nombre de campo si es un str; otras claves (numeros, subclases de str) se usan tal cual
+    """
+    return sys.intern(field_name) if type(field_name) is str else field_name
+
+_ESTADO_VALIDO = "válido"
+_ESTADO_INVALIDO = "inválido"
+
+def _normalize_amount(value) -> Optional[float]:
+    """
+    Convierte un monto (distinto de None) a float
+    Si ya es numerico solo se convierte; si no, se limpian los caracteres no numericos y se estandariza
+    el separador decimal a '.'
+    :return: El monto como float, None si no se puede convertir
+    """
+    if isinstance(value, float):
+        # NaN e infinito no son montos validos (antes su texto quedaba vacio y no se podia convertir)
+        return value if math.isfinite(value) else None
+    if isinstance(value, int) and not isinstance(value, bool):
+        try:
+            return float(value)
+        except OverflowError:
+            # Enteros que no caben en un float quedan en +-inf, como cuando se convertian desde su texto
+            return math.inf if value > 0 else -math.inf
+    try:
+        return float(_STRIP_RE.sub("", str(value)).replace(",","."))
+    except ValueError:
+        return None
 
 # === CLASE BASE ===
-class Operation(ABC):
+class Operation:
     """
-    Clase base abstracta
+    Clase base de las operaciones
+    No usa ABC para evitar el chequeo de metodos abstractos al instanciar; las subclases deben sobreescribir apply
+    Las operaciones usan __slots__: sin __dict__ por instancia y acceso a atributos mas rapido en apply
     """
-    @abstractmethod
-    def apply(self, record:Dict) -> Tuple[Dict,List[str]]:
+    __slots__ = ()
+
+    def apply(self, record:Dict) -> Tuple[Dict,Sequence[str]]:
         """
         Aplica una operación a un registro.
         :param record(Dict) Registro a procesar
-        :return: Tuple[Dict,List[str] Tupla conteniendo el registro(modificado) y lista de mensajes de error
+        :return: Tuple[Dict,Sequence[str]] Tupla conteniendo el registro(modificado) y secuencia de mensajes de error
         """
-        pass
+        raise NotImplementedError
+
+    def apply_batch(self, records:List[Dict]) -> List[Sequence[str]]:
+        """
+        Aplica la operación a un grupo de registros del mismo contexto.
+        Por defecto llama a apply por cada registro; las subclases pueden sobreescribirlo para
+        preparar el trabajo una sola vez por grupo. Si apply devuelve otro registro, se reemplaza en la lista.
+        :param records: Registros a procesar, se modifican en el lugar
+        :return: Lista con los mensajes de error de cada registro, en el mismo orden
+        """
+        apply = self.apply
+        batch_errors = []
+        for i, record in enumerate(records):
+            records[i], errors = apply(record)
+            batch_errors.append(errors)
+        return batch_errors
 
 # === OPERACIÓN DE NORMALIZACIÓN DE MONTOS ===
 class NormalizeAmountOperation(Operation):
@@ -22,18 +112,23 @@ class NormalizeAmountOperation(Operation):
     Operation para normalizar campo numerico a float del campo "amount"
     Limpia el valor de caracteres no numericos, menos el separador de decimales
     """
+    __slots__ = ("field_name", "_err_missing", "_err_conversion")
+
     def __init__(self, field_name:str):
         """
         Inicializa la operacion de normalizacion
         :param field_name: Nombre del campo en el registro que contiene el monto
         """
-        self.field_name = field_name
+        self.field_name = _intern_field_name(field_name)
+        # Mensajes de error armados una sola vez; el de conversion se completa con el valor usando %
+        self._err_missing = f"Campo ' {field_name}' no encontrado"
+        self._err_conversion = "En campo '" + str(field_name).replace("%", "%%") + "'el valor ' %s' no se puede convertirse a float"
 
-    def apply(self, record:Dict) -> Tuple[Dict,List[str]]:
-        errors=[]
+    def apply(self, record:Dict) -> Tuple[Dict,Sequence[str]]:
+        errors=_NO_ERRORS
         if self.field_name not in record:
             # Si el campo no existe añade un error establece el campo a None.
-            errors.append(f"Campo ' {self.field_name}' no encontrado")
+            errors = [self._err_missing]
             record[self.field_name] = None
             return record,errors
 
@@ -43,41 +138,110 @@ class NormalizeAmountOperation(Operation):
             # Si value es None, no se normaliza.
             return record,errors
 
-        try:
-            # Convertir a string para asegurar que re.sub funcione
-            cleaned_value = re.sub(r"[^\d.,-]", "", str(value))
-            cleaned_value=cleaned_value.replace(",",".") # Estandariza el separador decimal a '.'
-            record[self.field_name] = float(cleaned_value)
-        except ValueError:
+        amount = _normalize_amount(value)
+        if amount is None:
             # Si la conversión falla registrar el error y establecer el campo a None.
-            errors.append(f"En campo '{self.field_name}'el valor ' {value}' no se puede convertirse a float")
-            record[self.field_name] = None
+            errors = [self._err_conversion % (value,)]
+        record[self.field_name] = amount
 
         return record,errors
 
+    def apply_batch(self, records:List[Dict]) -> List[Sequence[str]]:
+        if _normalize_amounts_c is None:
+            # Sin la extension _amount convertir por columna no es mas rapido que registro a registro
+            return super().apply_batch(records)
+
+        # Convierte toda la columna con la extension y luego escribe los resultados en cada registro
+        field_name = self.field_name
+        err_missing = self._err_missing
+        err_conversion = self._err_conversion
+        values = [record.get(field_name) for record in records]
+        amounts = _normalize_amounts_c(values, _normalize_amount)
+
+        batch_errors = []
+        append = batch_errors.append
+        for record, value, amount in zip(records, values, amounts):
+            if field_name not in record:
+                append([err_missing])
+            elif amount is None and value is not None:
+                append([err_conversion % (value,)])
+            else:
+                append(_NO_ERRORS)
+            record[field_name] = amount
+        return batch_errors
+
 # === VALIDACIÓN CONTEXTUAL ===
 class ContextualFieldValidation(Operation):
     """
     Operation para validar un campo usando una expresión regular
     """
-    def __init__(self, field_name:str, regex: Optional[str]=None):
+    __slots__ = ("field_name", "regex", "_pattern", "_err_missing", "_err_regex", "_err_empty")
+
+    def __init__(self, field_name:str, regex: Optional[str]=None, use_re2: bool=False):
         """
         Inicializa la operacion de validacion
         :param field_name: Nombre del campo a validar
         :param regex: Expresión regular opcional que el valor del campo debe cumplir.
+        :param use_re2: Compila la expresión con google-re2 (debe estar instalado). Garantiza tiempo lineal
+                        ante entradas maliciosas, pero en patrones cortos es mas lento que `re` y cambia la
+                        semantica: \d y \w solo aceptan ASCII y $ no acepta un salto de linea final.
+                        Lanza ValueError si re2 no soporta el patrón (referencias hacia atrás, lookaround).
         """
-        self.field_name = field_name
+        self.field_name = _intern_field_name(field_name)
         self.regex = regex
+        # Se compila una sola vez para no buscar en la cache de `re` por cada registro
+        self._pattern = _compile_regex(regex, use_re2) if regex else None
+        # Mensajes de error armados una sola vez, no dependen del registro
+        self._err_missing = f"Campo obligatorio ' {field_name}' no encontrado"
+        self._err_regex = f"Campo ' {field_name}' no cumple formato esperado"
+        self._err_empty = f"Campo obligatorio '{field_name}' está vacío"
 
-    def apply(self, record:Dict) -> Tuple[Dict,List[str]]:
-        errors=[]
+    def apply(self, record:Dict) -> Tuple[Dict,Sequence[str]]:
+        errors=_NO_ERRORS
 
         if self.field_name not in record:
-            errors.append(f"Campo obligatorio ' {self.field_name}' no encontrado")
-        elif self.field_name in record and self.regex and not re.match(self.regex, str(record[self.field_name])):
-            errors.append(f"Campo ' {self.field_name}' no cumple formato esperado")
+            errors = [self._err_missing]
+        elif self._pattern and not self._pattern.match(str(record[self.field_name])):
+            errors = [self._err_regex]
         elif not record[self.field_name]:
-            errors.append(f"Campo obligatorio '{self.field_name}' está vacío")
+            errors = [self._err_empty]
+        return record, errors
+
+class _FieldValidationGroup(Operation):
+    """
+    Operation que fusiona validaciones consecutivas de un mismo contexto
+    Aplica las mismas reglas que cada ContextualFieldValidation, en el mismo orden,
+    pero recorre todos los campos en un solo ciclo en lugar de despachar una operación por campo
+    """
+    __slots__ = ("_checks",)
+
+    def __init__(self, validations:List[ContextualFieldValidation]):
+        """
+        Inicializa el grupo de validaciones
+        :param validations: Validaciones a fusionar, en el orden en que deben aplicarse
+        """
+        self._checks = [
+            (v.field_name, v._pattern.match if v._pattern else None, v._err_missing, v._err_regex, v._err_empty)
+            for v in validations
+        ]
+
+    def apply(self, record:Dict) -> Tuple[Dict,Sequence[str]]:
+        errors=_NO_ERRORS
+        for field_name, match, err_missing, err_regex, err_empty in self._checks:
+            if field_name not in record:
+                error_msg = err_missing
+            else:
+                value = record[field_name]
+                if match and not match(str(value)):
+                    error_msg = err_regex
+                elif not value:
+                    error_msg = err_empty
+                else:
+                    continue
+            if errors is _NO_ERRORS:
+                errors = [error_msg]
+            else:
+                errors.append(error_msg)
         return record, errors
 
 # === GESTOR DE REGISTROS DE CONTEXTOS ===
@@ -88,6 +252,9 @@ class RecordContextManager:
     """
     def __init__(self):
         self.context_operations: Dict[str, List[Operation]] = {}
+        # Operaciones listas para ejecutar por contexto, junto a la lista registrada de la que salieron
+        # (ver _compiled_operations)
+        self._compiled_cache: Dict[str, Tuple[Tuple[Operation, ...], List[Operation]]] = {}
 
     def register_context(self, context_type:str, operations:List[Operation]) -> None:
         """
@@ -100,6 +267,47 @@ class RecordContextManager:
             raise ValueError(f"El contexto '{context_type}' ya está registrado")
         self.context_operations[context_type] = operations
 
+    def _compiled_operations(self) -> Dict[str, List[Operation]]:
+        """
+        Devuelve las operaciones a ejecutar por contexto (ver _compile_context)
+        Se toman de context_operations al empezar cada procesamiento: si la lista de un contexto cambio
+        desde la ultima vez, se vuelve a compilar, asi los cambios en context_operations siguen teniendo efecto
+        :return: Operaciones compiladas por tipo de contexto
+        """
+        compiled_cache = {}
+        for context_type, operations in self.context_operations.items():
+            snapshot = tuple(operations)
+            cached = self._compiled_cache.get(context_type)
+            if cached is None or cached[0] != snapshot:
+                cached = (snapshot, self._compile_context(snapshot))
+            compiled_cache[context_type] = cached
+        self._compiled_cache = compiled_cache
+        return {context_type: compiled for context_type, (_, compiled) in compiled_cache.items()}
+
+    @staticmethod
+    def _compile_context(operations:Sequence[Operation]) -> List[Operation]:
+        """
+        Prepara la lista de operaciones que se ejecuta para un contexto
+        Las ContextualFieldValidation consecutivas se reemplazan por un _FieldValidationGroup;
+        el resto de operaciones se mantiene en su posicion para conservar el orden de los errores
+        :param operations: Operaciones registradas para el contexto
+        :return: Lista de operaciones a ejecutar
+        """
+        compiled: List[Operation] = []
+        run: List[ContextualFieldValidation] = []
+        for operation in [*operations, None]:
+            if type(operation) is ContextualFieldValidation:
+                run.append(operation)
+                continue
+            if len(run) > 1:
+                compiled.append(_FieldValidationGroup(run))
+            else:
+                compiled.extend(run)
+            run = []
+            if operation is not None:
+                compiled.append(operation)
+        return compiled
+
     def process_stream(self, record_iterator: Iterable[Dict])->Iterable[Tuple[Dict,List[str]]]:
         """
         Procesa un registro aplicando las operaciones que contiene el tipo de contexto segun __type__
@@ -107,32 +315,179 @@ class RecordContextManager:
         :return: Tupla con registro procesado y lista de errores.
                 El registro procesado incluye campos: __estado__ y __errors__
         """
+        context_operations = self._compiled_operations()
         for record in record_iterator:
-            errors = []
-            # Establecer valores por defecto para metadatos de procesamiento en el registro.
-            record.setdefault("__estado__", "válido")
-            record.setdefault("__errors__", [])
-
-            context_type = record.get("__type__")
-            if not context_type or context_type not in self.context_operations:
-                error_msg=f"Tipo de registro '{context_type}' no reconocido"
-                errors.append(error_msg)
-                record["__estado__"] = "inválido"
-                record["__errors__"].append(error_msg)
-                yield record, errors
-                continue
+            yield _process_record(record, context_operations)
+
+    def process_stream_parallel(self, record_iterator: Iterable[Dict], workers: Optional[int]=None,
+                                chunksize: int=64) -> Iterable[Tuple[Dict,List[str]]]:
+        """
+        Igual que process_stream pero reparte los registros entre varios procesos
+        Los registros son independientes entre si, el orden de salida es el de entrada.
+        Como cada proceso trabaja sobre una copia, los registros devueltos no son los mismos objetos de entrada
+        Se leen registros de la entrada solo a medida que se consumen resultados: como maximo hay
+        2 * workers bloques de chunksize registros en proceso, asi que sirve para flujos largos o infinitos.
+        :param record_iterator: Iterable que produce diccionario(registro)
+        :param workers: Numero maximo de procesos (por defecto el numero de CPUs)
+        :param chunksize: Cantidad de registros que se envian juntos a cada proceso
+        :return: Tupla con registro procesado y lista de errores.
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers < 1:
+            raise ValueError("workers debe ser mayor o igual a 1")
+        if chunksize < 1:
+            raise ValueError("chunksize debe ser mayor o igual a 1")
+        # Los argumentos se validan al llamar; los registros se procesan al iterar el resultado
+        return self._process_stream_parallel(iter(record_iterator), workers, chunksize)
+
+    def _process_stream_parallel(self, records: Iterator[Dict], workers: int,
+                                 chunksize: int) -> Iterator[Tuple[Dict,List[str]]]:
+        """
+        Generador de process_stream_parallel, recibe los argumentos ya validados
+        """
+        pending = deque()
+        # Las operaciones se envian una sola vez a cada proceso, no con cada bloque
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                       initargs=(self._compiled_operations(),))
+        try:
+            exhausted = False
+            while True:
+                while not exhausted and len(pending) < 2 * workers:
+                    chunk = list(islice(records, chunksize))
+                    if chunk:
+                        pending.append(executor.submit(_process_chunk, chunk))
+                    else:
+                        exhausted = True
+                if not pending:
+                    break
+                yield from pending.popleft().result()
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    def process_batch(self, records: Iterable[Dict]) -> List[Tuple[Dict,List[str]]]:
+        """
+        Procesa un lote de registros agrupandolos por __type__
+        Cada operación se aplica de una vez a todos los registros de su contexto (apply_batch);
+        NormalizeAmountOperation convierte la columna de montos con la extension _amount si está compilada.
+        El resultado conserva el orden de entrada y es el mismo que daria process_stream.
+        :param records: Registros a procesar
+        :return: Lista de tuplas con registro procesado y lista de errores.
+        """
+        context_operations = self._compiled_operations()
+        results: List[Tuple[Dict,List[str]]] = []
+        groups: Dict[str, List[int]] = {}
+        for record in records:
+            _init_metadata(record)
+            context_type = record.get(_K_TYPE)
+            if context_type and context_type in context_operations:
+                groups.setdefault(context_type, []).append(len(results))
+                results.append((record, []))
+            else:
+                results.append(_reject_unknown_type(record, context_type))
+
+        for context_type, positions in groups.items():
+            bucket = [results[i][0] for i in positions]
+            bucket_errors = [results[i][1] for i in positions]
+            for operation in context_operations[context_type]:
+                for errors, op_errors in zip(bucket_errors, operation.apply_batch(bucket)):
+                    if op_errors:
+                        errors.extend(op_errors)
+
+            for i, record, errors in zip(positions, bucket, bucket_errors):
+                if errors:
+                    _mark_invalid(record, errors)
+                results[i] = (record, errors)
+
+        return results
+
+    def process_stream_batches(self, record_iterator: Iterable[Dict],
+                               batch_size: int=1024) -> Iterable[List[Tuple[Dict,List[str]]]]:
+        """
+        Procesa un flujo de registros por lotes de hasta batch_size registros (ver process_batch)
+        Entrega cada lote completo, util para consumidores que escriben por lotes (bulk insert, productores)
+        :param record_iterator: Iterable que produce diccionario(registro)
+        :param batch_size: Cantidad maxima de registros por lote
+        :return: Listas de tuplas con registro procesado y lista de errores, en el orden de entrada.
+        """
+        batch = []
+        for record in record_iterator:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                yield self.process_batch(batch)
+                batch = []
+        if batch:
+            yield self.process_batch(batch)
+
+def _init_metadata(record:Dict) -> None:
+    """
+    Establece valores por defecto para metadatos de procesamiento en el registro.
+    Un registro nuevo no tiene ninguno de los dos; solo si ya fue procesado se revisa cada uno.
+    """
+    if _K_ESTADO not in record:
+        record[_K_ESTADO] = _ESTADO_VALIDO
+        record[_K_ERRORS] = []
+    elif _K_ERRORS not in record:
+        record[_K_ERRORS] = []
+
+def _reject_unknown_type(record:Dict, context_type:Optional[str]) -> Tuple[Dict,List[str]]:
+    """
+    Marca como inválido un registro cuyo __type__ no tiene contexto registrado
+    """
+    errors = [f"Tipo de registro '{context_type}' no reconocido"]
+    _mark_invalid(record, errors)
+    return record, errors
+
+def _mark_invalid(record:Dict, errors:List[str]) -> None:
+    """
+    Marca el registro como inválido y le agrega los errores encontrados
+    """
+    record[_K_ESTADO] = _ESTADO_INVALIDO
+    record[_K_ERRORS].extend(errors)
+
+# Operaciones registradas, en cada proceso de process_stream_parallel (ver _init_worker)
+_worker_operations: Dict[str, List[Operation]] = {}
+
+def _init_worker(context_operations:Dict[str, List[Operation]]) -> None:
+    """
+    Inicializa un proceso de process_stream_parallel con las operaciones por tipo de contexto
+    """
+    global _worker_operations
+    _worker_operations = context_operations
+
+def _process_chunk(records:List[Dict]) -> List[Tuple[Dict,List[str]]]:
+    """
+    Procesa un bloque de registros en un proceso de process_stream_parallel
+    """
+    return [_process_record(record, _worker_operations) for record in records]
+
+def _process_record(record:Dict, context_operations:Dict[str, List[Operation]]) -> Tuple[Dict,List[str]]:
+    """
+    Aplica a un registro las operaciones de su tipo de contexto segun __type__
+    Funcion de modulo para que pueda enviarse a otros procesos
+    :param record: Registro a procesar
+    :param context_operations: Operaciones registradas por tipo de contexto
+    :return: Tupla con registro procesado y lista de errores.
+    """
+    _init_metadata(record)
+
+    context_type = record.get(_K_TYPE)
+    operations = context_operations.get(context_type) if context_type else None
+    if operations is None:
+        return _reject_unknown_type(record, context_type)
 
-            # Aplicar cada operación asociada al tipo de contexto
-            for operation in self.context_operations[context_type]:
-                record, op_errors = operation.apply(record)
-                errors.extend(op_errors)
+    # Aplicar cada operación asociada al tipo de contexto
+    errors = []
+    for operation in operations:
+        record, op_errors = operation.apply(record)
+        if op_errors:
+            errors.extend(op_errors)
 
-            # Si hubo errores, marcar registro como inválido
-            if errors:
-                record["__estado__"] = "inválido"
-                record["__errors__"].extend(errors)
+    # Si hubo errores, marcar registro como inválido
+    if errors:
+        _mark_invalid(record, errors)
 
-            yield record, errors
+    return record, errors
 
 # === EJEMPLO DE USO ===
 if __name__ == '__main__':
@@ -0,0 +1,84 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Normalizacion de montos en C para NormalizeAmountOperation.apply_batch
+Opcional: DinamoFlow usa la version en Python si este modulo no esta compilado.
+Compilar con: cythonize -i _amount.pyx
+"""
+from libc.math cimport isfinite
+from cpython.unicode cimport PyUnicode_GET_LENGTH, PyUnicode_READ_CHAR, Py_UNICODE_ISDECIMAL
+
+cdef extern from "Python.h":
+    # Mismo parser que float(), independiente del locale
+    double PyOS_string_to_double(const char *s, char **endptr, object overflow_exception) except? -1.0
+
+cdef enum:
+    BUF_SIZE = 64
+
+cpdef list normalize_amounts(list values, object fallback):
+    """
+    Convierte una columna de montos a float: conserva solo [0-9.,-], cambia ',' por '.' y convierte
+    :param values: Valores a convertir
+    :param fallback: Funcion de Python para los valores que no se procesan aqui
+                     (otros tipos, digitos no ASCII o montos demasiado largos); debe devolver float o None
+    :return: Lista con el float de cada valor; None si el valor era None o no se pudo convertir
+    """
+    cdef Py_ssize_t i, j, k, length, n = len(values)
+    cdef list out = [None] * n
+    cdef char buf[BUF_SIZE]
+    cdef char *end
+    cdef Py_UCS4 ch
+    cdef bint use_fallback
+    cdef double amount
+    cdef object value
+
+    for i in range(n):
+        value = values[i]
+        if value is None:
+            continue
+        if type(value) is float:
+            # NaN e infinito no son montos validos, igual que en la version en Python
+            if isfinite(value):
+                out[i] = value
+            continue
+        if type(value) is int:
+            try:
+                out[i] = float(value)
+            except OverflowError:
+                # Enteros que no caben en un float quedan en +-inf, igual que en la version en Python
+                out[i] = float("inf") if value > 0 else float("-inf")
+            continue
+        if type(value) is not str:
+            out[i] = fallback(value)
+            continue
+
+        length = PyUnicode_GET_LENGTH(value)
+        k = 0
+        use_fallback = False
+        for j in range(length):
+            ch = PyUnicode_READ_CHAR(value, j)
+            if (ch >= 48 and ch <= 57) or ch == 46 or ch == 45:
+                buf[k] = <char>ch
+            elif ch == 44:
+                buf[k] = 46
+            elif ch > 127 and Py_UNICODE_ISDECIMAL(ch):
+                # float() acepta digitos de otros alfabetos, se deja a la version en Python
+                use_fallback = True
+                break
+            else:
+                continue
+            k += 1
+            if k == BUF_SIZE:
+                use_fallback = True
+                break
+        if use_fallback:
+            out[i] = fallback(value)
+            continue
+        buf[k] = 0
+        try:
+            amount = PyOS_string_to_double(buf, &end, None)
+        except ValueError:
+            continue
+        # Igual que float(): el texto limpio debe consumirse completo
+        if end == buf + k:
+            out[i] = amount
+    return out
@@ -0,0 +1,191 @@
+import copy
+import random
+import unittest
+
+import DinamoFlow
+
+
+class NormalizeAmountOperationTest(unittest.TestCase):
+    def test_non_finite_floats_are_rejected(self):
+        operation = DinamoFlow.NormalizeAmountOperation("amount")
+        for value in (float("nan"), float("inf"), float("-inf")):
+            record, errors = operation.apply({"amount": value})
+            self.assertIsNone(record["amount"])
+            self.assertEqual(len(errors), 1)
+            self.assertIn("no se puede convertirse a float", errors[0])
+
+    def test_non_str_field_names(self):
+        class Name(str):
+            pass
+
+        for field_name in (1, Name("amount%")):
+            operation = DinamoFlow.NormalizeAmountOperation(field_name)
+            self.assertEqual(operation.apply({field_name: "12,5"}), ({field_name: 12.5}, ()))
+            record, errors = operation.apply({field_name: "x"})
+            self.assertEqual(errors, [f"En campo '{field_name}'el valor ' x' no se puede convertirse a float"])
+
+            validation = DinamoFlow.ContextualFieldValidation(field_name, regex=r"^x$")
+            self.assertEqual(validation.apply({field_name: "x"}), ({field_name: "x"}, ()))
+
+
+@unittest.skipIf(DinamoFlow._normalize_amounts_c is None, "extension _amount no compilada")
+class NormalizeAmountsExtensionTest(unittest.TestCase):
+    """
+    La extension _amount debe dar los mismos montos que _normalize_amount
+    """
+    def assertSameAmounts(self, values):
+        expected = [None if value is None else DinamoFlow._normalize_amount(value) for value in values]
+        actual = DinamoFlow._normalize_amounts_c(values, DinamoFlow._normalize_amount)
+        for value, exp, act in zip(values, expected, actual):
+            self.assertEqual((type(exp), exp), (type(act), act), msg=repr(value))
+
+    def test_special_values(self):
+        self.assertSameAmounts([
+            None, True, False, 0, 3, -7, 2.5, -0.0, 10**400, -10**400,
+            float("nan"), float("inf"), float("-inf"), 1e-05, 1e16,
+            "", "-", ".", "1e5", "123,45 EUR", "123,45 €", "$1,234.56", "1.2.3", "--1",
+            "٣٤,5", "1" * 62, "1" * 63, "1" * 64, "9" * 400, b"12", ("1", "2"),
+        ])
+
+    def test_random_strings(self):
+        rng = random.Random(0)
+        alphabet = "0123456789.,-- €$abcE_ \n٣+xé"
+        values = ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12))) for _ in range(50000)]
+        self.assertSameAmounts(values)
+
+
+@unittest.skipIf(DinamoFlow.re2 is None, "google-re2 no instalado")
+class Re2ValidationTest(unittest.TestCase):
+    def test_opt_in_uses_re2(self):
+        validation = DinamoFlow.ContextualFieldValidation("order_id", regex=r"^ORD\d+$", use_re2=True)
+        self.assertEqual(validation.apply({"order_id": "ORD12"})[1], ())
+        self.assertEqual(len(validation.apply({"order_id": "ORDx"})[1]), 1)
+
+    def test_unsupported_pattern_raises(self):
+        # Sin re2 no hay garantia de tiempo lineal, no se cae silenciosamente a `re`
+        with self.assertRaises(ValueError):
+            DinamoFlow.ContextualFieldValidation("order_id", regex=r"^(a)\1$", use_re2=True)
+
+
+class ProcessingModesTest(unittest.TestCase):
+    """
+    process_batch, process_stream_batches y process_stream_parallel
+    deben dar el mismo resultado que process_stream
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.manager = DinamoFlow.RecordContextManager()
+        cls.manager.register_context(
+            "order_event",
+            [
+                DinamoFlow.NormalizeAmountOperation("amount"),
+                DinamoFlow.ContextualFieldValidation("order_id", regex=r"^ORD\d+$"),
+                DinamoFlow.ContextualFieldValidation("customer_name"),
+                DinamoFlow.ContextualFieldValidation("timestamp", regex=r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}Z$"),
+            ]
+        )
+        cls.manager.register_context(
+            "product_update",
+            [
+                DinamoFlow.NormalizeAmountOperation("price"),
+                DinamoFlow.ContextualFieldValidation("product_sku", regex=r"^SKU_\w+$"),
+            ]
+        )
+
+        rng = random.Random(1)
+        values = [
+            "", None, True, False, 0, 3, 2.5, 10**400, "ORD12", "ORDx", "ORD1\n", "SKU_a1", "SKU_é",
+            "12,5 €", "no_es_un_numero", "Ana", "2024-10-26T14:00:00Z", "2024-13-01T25:61",
+        ]
+        valid = {
+            "order_event": {
+                "order_id": "ORD789", "customer_name": "Luis Vargas",
+                "amount": "123,45 EUR", "timestamp": "2024-10-26T14:00:00Z",
+            },
+            "product_update": {"product_sku": "SKU_P002", "price": "25.00"},
+        }
+        cls.records = []
+        for _ in range(2000):
+            # Tipo conocido, desconocido, vacio o ausente
+            context_type = rng.choice(["order_event", "order_event", "product_update", "product_update", "otro", "", None])
+            record = dict(valid.get(context_type, valid["order_event"]))
+            if context_type is not None:
+                record["__type__"] = context_type
+            # Algunos campos se quitan o cambian por valores de todo tipo
+            for field in list(record):
+                if field != "__type__" and rng.random() < 0.15:
+                    if rng.random() < 0.3:
+                        del record[field]
+                    else:
+                        record[field] = rng.choice(values)
+            # Registros que ya pasaron por el gestor
+            if rng.random() < 0.1:
+                record["__estado__"] = "válido"
+                if rng.random() < 0.5:
+                    record["__errors__"] = ["error previo"]
+            cls.records.append(record)
+
+        cls.expected = list(cls.manager.process_stream(copy.deepcopy(cls.records)))
+
+    def test_process_batch(self):
+        self.assertEqual(self.manager.process_batch(copy.deepcopy(self.records)), self.expected)
+
+    def test_process_stream_batches(self):
+        batches = list(self.manager.process_stream_batches(copy.deepcopy(self.records), batch_size=7))
+        self.assertTrue(all(len(batch) == 7 for batch in batches[:-1]))
+        self.assertEqual([result for batch in batches for result in batch], self.expected)
+
+    def test_process_stream_parallel(self):
+        results = list(self.manager.process_stream_parallel(iter(self.records), workers=2, chunksize=16))
+        self.assertEqual(results, self.expected)
+
+    def test_process_stream_parallel_rejects_invalid_sizes(self):
+        # Se valida al llamar, antes de consumir registros
+        for kwargs in ({"chunksize": 0}, {"workers": 0}, {"chunksize": -1}):
+            with self.assertRaises(ValueError):
+                self.manager.process_stream_parallel(iter(self.records), **kwargs)
+
+
+
+class CompiledOperationsTest(unittest.TestCase):
+    def setUp(self):
+        self.validations = [
+            DinamoFlow.ContextualFieldValidation("order_id", regex=r"^ORD\d+$"),
+            DinamoFlow.ContextualFieldValidation("customer_name"),
+            DinamoFlow.ContextualFieldValidation("timestamp", regex=r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}Z$"),
+        ]
+
+    def test_fused_group_matches_unfused_validations(self):
+        group = DinamoFlow._FieldValidationGroup(self.validations)
+        rng = random.Random(2)
+        values = ["", None, 0, 7, True, "ORD12", "ORDx", "ORD1\n", "Ana", "2024-10-26T14:00:00Z", "2024-13-01"]
+        for _ in range(2000):
+            record = {}
+            for field in ("order_id", "customer_name", "timestamp"):
+                if rng.random() < 0.8:
+                    record[field] = rng.choice(values)
+            expected = []
+            for validation in self.validations:
+                _, errors = validation.apply(dict(record))
+                expected.extend(errors)
+            fused_record, fused_errors = group.apply(dict(record))
+            self.assertEqual(fused_record, record)
+            self.assertEqual(list(fused_errors), expected, msg=repr(record))
+
+    def test_context_operations_changes_take_effect(self):
+        manager = DinamoFlow.RecordContextManager()
+        manager.register_context("order_event", self.validations[:2])
+        record = {"__type__": "order_event", "order_id": "ORD1", "customer_name": "Ana"}
+        [(processed, errors)] = manager.process_stream([dict(record)])
+        self.assertEqual(processed["__estado__"], "válido")
+
+        # Agregar una operacion despues de registrar el contexto tiene efecto en el siguiente procesamiento
+        manager.context_operations["order_event"].append(self.validations[2])
+        for results in (list(manager.process_stream([dict(record)])), manager.process_batch([dict(record)])):
+            [(processed, errors)] = results
+            self.assertEqual(processed["__estado__"], "inválido")
+            self.assertEqual(errors, ["Campo obligatorio ' timestamp' no encontrado"])
+
+
+if __name__ == "__main__":
+    unittest.main()